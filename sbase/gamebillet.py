@@ -1,10 +1,16 @@
+import orjson
+from lxml import etree, html
 from seleniumbase import SB
 
-import json
 import os
 import random
+import re
 import time
 
+from utils import NUM_TBL, wait_until
+
+_PRICE = re.compile(r"\d+(\.\d+)?")
+
 
 class Gamebillet:
     output_dir = "output/gamebillet"
@@ -14,12 +20,33 @@ class Gamebillet:
     url_sitemap = "https://www.gamebillet.com/sitemap.xml"
 
     css_item = ".grid-item--card"
-
-    css_name = "h3 a"
-    css_price = ".buy-wrapper span"
-    css_discount = ".buy-wrapper a"
     css_next_page = ".next-page"
 
+    # JSON encoded, null until the page has finished loading
+    js_first_name = f"""
+    JSON.stringify(
+        document.readyState === "complete"
+            ? document.querySelector("{css_item} h3 a")?.textContent.trim() ?? ""
+            : null
+    )
+    """
+
+    # cards are parsed from a single page source read instead of querying each
+    # field through cdp
+    xpath_item = etree.XPath(
+        "//*[contains(concat(' ', normalize-space(@class), ' '), ' grid-item--card ')]"
+    )
+    # text nodes of the first match, joined with spaces like cdp element.text
+    xpath_name = etree.XPath("(.//h3//a)[1]//text()")
+    xpath_price = etree.XPath(
+        "(.//*[contains(concat(' ', normalize-space(@class), ' '),"
+        " ' buy-wrapper ')]//span)[1]//text()"
+    )
+    xpath_discount = etree.XPath(
+        "(.//*[contains(concat(' ', normalize-space(@class), ' '),"
+        " ' buy-wrapper ')]//a)[1]//text()"
+    )
+
     def all(self):
         self.download("all", self.url)
 
@@ -27,10 +54,16 @@ class Gamebillet:
         self.download("on_sale", self.url_on_sale)
 
     def sitemap(self):
-        now = time.clock_gettime(time.CLOCK_REALTIME)
+        now = int(time.time())
         output_path = f"{self.output_dir}/sitemap_{now}.xml"
 
-        with SB(uc=True, undetectable=True, locale="en") as sb:
+        with SB(
+            uc=True,
+            undetectable=True,
+            locale="en",
+            disable_js=True,
+            block_images=True,
+        ) as sb:
             sb.activate_cdp_mode(self.url_sitemap)
             sb.sleep(2)
             page_source = sb.cdp.get_page_source()
@@ -39,12 +72,10 @@ class Gamebillet:
 
     def download(self, output_prefix: str, url: str):
         os.makedirs(self.output_dir, exist_ok=True)
-        now = time.clock_gettime(time.CLOCK_REALTIME)
+        now = int(time.time())
 
         output_path = f"{self.output_dir}/{output_prefix}_{now}.json"
-        f = open(output_path, "w")
-
-        with SB(
+        with open(output_path, "wb", buffering=1 << 20) as f, SB(
             uc=True,
             undetectable=True,
             ad_block_on=True,
@@ -54,61 +85,46 @@ class Gamebillet:
         ) as sb:
             sb.activate_cdp_mode(url)
             sb.uc_gui_click_captcha()
-            sb.sleep(2)
+            sb.cdp.wait_for_element_visible(self.css_item, timeout=10)
 
             count = 0
             while True:
-                start = time.perf_counter()
-
-                output = []
-
                 count += 1
                 print(f"on page {count}")
-                sb.cdp.sleep(1.2 + random.random())
+                sb.cdp.sleep(0.2 + random.random() * 0.4)
 
-                items = sb.cdp.select_all(self.css_item)
-                for item in items:
-                    name = item.query_selector(self.css_name).text
-                    discount_str = item.query_selector(self.css_discount).text
-                    price_str = item.query_selector(self.css_price).text
+                root = html.fromstring(sb.cdp.get_page_source())
+                for item in self.xpath_item(root):
+                    name = " ".join(self.xpath_name(item)).strip()
+                    discount_str = " ".join(self.xpath_discount(item)).strip()
+                    discount_str = discount_str.removeprefix("Sale").translate(NUM_TBL)
+                    discount_str = discount_str.strip()
+                    price_str = " ".join(self.xpath_price(item))
+                    price_str = price_str.translate(NUM_TBL).strip()
 
                     # unreleased items have no discount/price
-                    try:
-                        discount = int(
-                            discount_str.removeprefix("Sale")
-                            .replace("-", "")
-                            .replace("%", "")
-                        )
-                    except ValueError:
-                        discount = 0
-
-                    try:
-                        price = float(price_str.replace("$", "").replace(",", ""))
-                    except ValueError:
-                        price = 0
-
-                    output.append(GamebilletPrice(name, discount, price).__dict__)
+                    discount = int(discount_str) if discount_str.isdigit() else 0
+                    price = float(price_str) if _PRICE.fullmatch(price_str) else 0.0
 
-                end = time.perf_counter()
-                duration = end - start
-                print(f"{duration:.6f} seconds")
-
-                json.dump(output, f)
-                f.write("\n")
+                    row = {"name": name, "percent_discount": discount, "price": price}
+                    f.write(orjson.dumps(row))
+                    f.write(b"\n")
 
                 button = sb.cdp.find(self.css_next_page)
                 if button.get_attribute("href") == "javascript:void(0);":
                     break
                 else:
+                    # the old page stays loaded until the next one replaces it
+                    first_name = orjson.loads(sb.cdp.evaluate(self.js_first_name))
                     sb.cdp.scroll_into_view(self.css_next_page)
                     sb.cdp.click(self.css_next_page)
-
-        f.flush()
-        f.close()
-
-
-class GamebilletPrice:
-    def __init__(self, name: str, percent_discount: int, price: float):
-        self.name = name
-        self.percent_discount = percent_discount
-        self.price = price
+                    try:
+                        wait_until(
+                            sb,
+                            self.js_first_name,
+                            lambda name: name is not None and name != first_name,
+                        )
+                    except TimeoutError as e:
+                        # keep the pages scraped so far
+                        print(f"stopping after page {count}: {e}")
+                        break
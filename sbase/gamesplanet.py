@@ -1,17 +1,11 @@
-import json
 import os
 import random
 import time
 
+import orjson
 from seleniumbase import SB
 
-
-class GamesplanetPrice:
-    def __init__(self, name: str, original_price: float, discount: int, price: float):
-        self.name = name
-        self.original_price = original_price
-        self.discount = discount
-        self.price = price
+from utils import NUM_TBL, wait_until
 
 
 class Gamesplanet:
@@ -22,21 +16,47 @@ class Gamesplanet:
     total_pages = ".page-item:nth-last-child(2) a"
 
     css_item = "div[class~='no-gutters']"
-    css_name = "h4 a"
-    css_base_price = ".price_base strike"
-    css_discount = ".price_saving"
-    css_price = ".price_current"
 
     css_next_page = "a[class='page-link next-page']"
 
+    # JSON encoded, null until the page has finished loading
+    js_active_page = r"""
+    JSON.stringify(
+        document.readyState === "complete"
+            ? document.querySelector(".page-item.active")?.textContent.match(/\d+/)?.[0]
+                ?? ""
+            : null
+    )
+    """
+
+    # extract every item on the page in a single cdp call, text nodes are
+    # joined with spaces like cdp element.text
+    js_items = f"""
+    (() => {{
+        const text = (el) => {{
+            if (!el) return "";
+            const nodes = [];
+            const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+            while (walker.nextNode()) nodes.push(walker.currentNode.nodeValue);
+            return nodes.join(" ");
+        }};
+        return JSON.stringify(
+            Array.from(document.querySelectorAll("{css_item}"), (e) => ({{
+                name: text(e.querySelector("h4 a")),
+                price: text(e.querySelector(".price_current")),
+                base: text(e.querySelector(".price_base strike")),
+                disc: text(e.querySelector(".price_saving")),
+            }}))
+        );
+    }})()
+    """
+
     def steam(self):
         os.makedirs(self.output_dir, exist_ok=True)
-        now = time.clock_gettime(time.CLOCK_REALTIME)
+        now = int(time.time())
 
         output_path = f"{self.output_dir}/on_sale_{now}.json"
-        f = open(output_path, "w")
-
-        with SB(
+        with open(output_path, "wb", buffering=1 << 20) as f, SB(
             uc=True,
             undetectable=True,
             ad_block_on=True,
@@ -46,59 +66,49 @@ class Gamesplanet:
         ) as sb:
             sb.activate_cdp_mode(self.url)
             sb.uc_gui_click_captcha()
-            sb.cdp.sleep(2)
+            sb.cdp.wait_for_element_visible(self.total_pages, timeout=10)
 
             total_pages = int(sb.cdp.select(self.total_pages).text)
             print(f"{total_pages = }")
 
             for i in range(1, total_pages + 1):
-                start = time.perf_counter()
                 print(f"on page {i}")
 
-                output = []
-
-                sb.cdp.sleep(1.1 + random.random())
+                # the previous page stays loaded until page i replaces it
+                try:
+                    wait_until(sb, self.js_active_page, lambda page: page == str(i))
+                except TimeoutError as e:
+                    # keep the pages scraped so far
+                    print(f"stopping before page {i}: {e}")
+                    break
+                sb.cdp.sleep(0.2 + random.random() * 0.4)
 
-                items = sb.cdp.select_all(self.css_item)
-                for item in items:
+                rows = orjson.loads(sb.cdp.evaluate(self.js_items))
+                for row in rows:
                     # always has name and .price_current
-                    name = item.query_selector(self.css_name).text
+                    name = row["name"].strip()
 
-                    price_str = item.query_selector(self.css_price).text
-                    price = float(price_str.replace("$", "").replace(",", ""))
-
-                    info = GamesplanetPrice(
-                        name=name, original_price=0.0, discount=0, price=0.0
-                    )
+                    price_str = row["price"].strip()
+                    price = float(price_str.translate(NUM_TBL))
 
                     # if an item is discounted, it will have .price_base strike (original), .price_saving, and .price_current (discounted)
                     # if not, it will only have .price_current, which is the ORIGINAL PRICE, NOT DISCOUNTED
-                    if base_price_elem := item.query_selector(self.css_base_price):
-                        info.original_price = float(
-                            base_price_elem.text.replace("$", "")
-                            .replace("%", "")
-                            .replace(",", "")
-                        )
-                        discount_str = item.query_selector(self.css_discount).text
-                        info.discount = int(
-                            discount_str.replace("-", "")
-                            .replace("%", "")
-                            .replace(",", "")
-                        )
-                        info.price = price
+                    if base_price_str := row["base"].strip():
+                        original_price = float(base_price_str.translate(NUM_TBL))
+                        discount_str = row["disc"].strip()
+                        discount = int(discount_str.translate(NUM_TBL))
                     else:
-                        info.original_price = price
-                        info.discount = 0
-                        info.price = price
-
-                    output.append(info.__dict__)
-
-                end = time.perf_counter()
-                duration = end - start
-                print(f"{duration:.6f} seconds")
-
-                json.dump(output, f)
-                f.write("\n")
+                        original_price = price
+                        discount = 0
+
+                    info = {
+                        "name": name,
+                        "original_price": original_price,
+                        "discount": discount,
+                        "price": price,
+                    }
+                    f.write(orjson.dumps(info))
+                    f.write(b"\n")
 
                 # find method raises instead of returning None
                 try:
@@ -106,6 +116,3 @@ class Gamesplanet:
                         sb.cdp.click(self.css_next_page)
                 except Exception:
                     break
-
-            f.flush()
-            f.close()
@@ -1,27 +1,29 @@
-import json
 import os
+from collections import deque
+from dataclasses import dataclass
 from typing import Sequence
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
+import orjson
+import requests
 from lxml import etree
 from seleniumbase import SB
 
+from utils import NUM_TBL
 
+
+@dataclass(slots=True)
 class Game:
-    def __init__(self, name: str, developer: str):
-        self.name = name
-        self.developer = developer
+    name: str
+    developer: str
 
 
+@dataclass(slots=True)
 class Bundle:
-    def __init__(
-        self, price: float, name: str, games: Sequence[Game], active_until: str
-    ):
-        self.price = price
-        self.name = name
-        self.games = games
-        self.active_until = active_until
+    price: float
+    name: str
+    games: Sequence[Game]
+    active_until: str
 
 
 class Indiegala:
@@ -31,6 +33,31 @@ class Indiegala:
     url_all = "https://indiegala.com/store_games_rss?sale=false"
     url_bundles = "https://indiegala.com/bundles"
 
+    # seconds, for each http request
+    timeout = 30
+    # bundle pages loading in background tabs at once
+    max_tabs = 3
+
+    xpath_rss = etree.XPath("descendant-or-self::rss")
+    xpath_current_page = etree.XPath("channel/currentPage/text()")
+    xpath_total_pages = etree.XPath("channel/totalPages/text()")
+    xpath_total_games = etree.XPath("channel/totalGames/text()")
+
+    # every carousel slide is already in the dom, only .active is shown
+    js_bundle_games = """
+    JSON.stringify(
+        Array.from(
+            document.querySelectorAll("#bundle-slider-carousel .carousel-item"),
+            (e) => ({
+                name: e.querySelector("h3.bundle-slider-game-info-title")
+                    ?.textContent.trim() ?? "",
+                developer: e.querySelector("div.bundle-slider-game-info-pub-dev a")
+                    ?.textContent.trim() ?? "",
+            })
+        )
+    )
+    """
+
     def on_sale(self):
         self.fetch(self.url_on_sale, "on_sale")
 
@@ -47,7 +74,7 @@ class Indiegala:
             uc=True, undetectable=True, ad_block_on=True, block_images=True, locale="en"
         ) as sb:
             sb.activate_cdp_mode(self.url_bundles)
-            sb.sleep(2)
+            sb.cdp.wait_for_element_visible(".fit-click", timeout=10)
 
             anchors = [
                 urljoin("https://indiegala.com/bundles", e.get_attribute("href"))
@@ -60,53 +87,83 @@ class Indiegala:
             expirations = [e.text for e in sb.cdp.find_all(".container-item-ends span")]
             print(anchors, names, expirations)
 
-            for i, a in enumerate(anchors):
-                sb.cdp.open(a)
-                sb.cdp.sleep(2)
+            # keep up to max_tabs bundle pages loading while the oldest one is
+            # parsed, new tabs are always opened from the listing tab
+            listing = sb.cdp.get_active_tab()
+            pending = deque(enumerate(anchors))
+            tabs = deque()
 
-                bundle_price = float(
-                    sb.cdp.select(".plt-color-main:first-child")
-                    .text.replace("$", "")
-                    .replace(",", "")
-                )
-                seen = set()
-                games = []
+            while pending or tabs:
+                while pending and len(tabs) < self.max_tabs:
+                    i, a = pending.popleft()
+                    sb.cdp.switch_to_tab(listing)
+                    sb.cdp.open_new_tab(a)
+                    tabs.append((i, sb.cdp.get_active_tab()))
 
-                sb.cdp.scroll_into_view(".carousel-inner")
-                sb.cdp.sleep(0.5)
+                i, tab = tabs.popleft()
+                sb.cdp.switch_to_tab(tab)
+                sb.cdp.wait_for_element_visible(".plt-color-main", timeout=10)
 
-                while True:
-                    # site uses js to transition active element into view
-                    name = sb.cdp.select(
-                        "div.active h3.bundle-slider-game-info-title"
-                    ).text
-                    if name in seen:
-                        break
+                price_str = sb.cdp.select(".plt-color-main:first-child").text
+                bundle_price = float(price_str.translate(NUM_TBL))
 
-                    developer = sb.cdp.select(
-                        "div.active div.bundle-slider-game-info-pub-dev a"
-                    ).text
-                    games.append(Game(name, developer).__dict__)
-                    seen.add(name)
-                    print(games)
+                seen = set()
+                games = []
+                for row in orjson.loads(sb.cdp.evaluate(self.js_bundle_games)):
+                    if row["name"] and row["name"] not in seen:
+                        games.append(Game(row["name"], row["developer"]))
+                        seen.add(row["name"])
 
-                    sb.cdp.click("#bundle-slider-carousel .carousel-control-next")
-                    sb.cdp.sleep(1)
+                # slides may be lazy loaded, fall back to stepping through them
+                if len(games) < 2:
+                    games = self.carousel_games(sb)
+                print(games)
 
-                bundles.append(
-                    Bundle(bundle_price, names[i], games, expirations[i]).__dict__
-                )
+                bundles.append(Bundle(bundle_price, names[i], games, expirations[i]))
                 print(bundles)
 
+                sb.cdp.close_active_tab()
+
         filename = f"{output_dir}/bundles.json"
-        with open(filename, "w") as f:
-            json.dump(bundles, f, indent=4)
+        with open(filename, "wb") as f:
+            f.write(orjson.dumps(bundles, option=orjson.OPT_INDENT_2))
+
+    def carousel_games(self, sb) -> list[Game]:
+        seen = set()
+        games = []
+
+        sb.cdp.scroll_into_view(".carousel-inner")
+        sb.cdp.sleep(0.5)
+
+        while True:
+            # site uses js to transition active element into view
+            name = sb.cdp.select("div.active h3.bundle-slider-game-info-title").text
+            if name in seen:
+                break
+
+            developer = sb.cdp.select(
+                "div.active div.bundle-slider-game-info-pub-dev a"
+            ).text
+            games.append(Game(name, developer))
+            seen.add(name)
+
+            sb.cdp.click("#bundle-slider-carousel .carousel-control-next")
+            sb.cdp.sleep(1)
+
+        return games
 
     def fetch(self, url: str, subdir: str):
         subdir_path = f"{self.output_dir}/{subdir}"
         os.makedirs(subdir_path, exist_ok=True)
 
-        with SB(uc=True, undetectable=True, ad_block_on=True, locale="en") as sb:
+        with SB(
+            uc=True,
+            undetectable=True,
+            ad_block_on=True,
+            locale="en",
+            disable_js=True,
+            block_images=True,
+        ) as sb:
             sb.activate_cdp_mode(url)
             sb.uc_gui_click_captcha()
             sb.sleep(2)
@@ -115,40 +172,50 @@ class Indiegala:
             current_page = 1
             total_pages = 0
             total_games = 0
-            parser = etree.XMLParser(remove_blank_text=True)
-
-            while True:
-                print(f"fetching page {page}")
-
-                page_source = sb.cdp.get_page_source()
-                soup = BeautifulSoup(page_source, "lxml-xml")
-                rss_tag = soup.find("rss")
-
-                rss_xml = str(rss_tag)
-
-                root = etree.fromstring(rss_xml.encode("utf-8"), parser)
-
-                parent = root.find("channel")
-                current_page = int(parent.find("currentPage").text)
-                total_pages = int(parent.find("totalPages").text)
-                total_games = int(parent.find("totalGames").text)
-                print(f"{current_page}/{total_pages} ({total_games})")
-
-                xml_bytes = etree.tostring(
-                    root,
-                    pretty_print=True,
-                    encoding="utf-8",
-                    xml_declaration=True,
-                )
-                output_path = f"{subdir_path}/{page}.xml"
-                with open(output_path, "w") as f:
-                    f.write(xml_bytes.decode("utf-8"))
-
-                if current_page == total_pages:
-                    break
-                else:
-                    sb.cdp.sleep(2)
-                    page += 1
-                    next_url = f"{url}&page={page}"
-                    print("going to next page: {url}")
-                    sb.cdp.open(next_url)
+            # chrome wraps the first page in its xml viewer markup, later pages
+            # are the raw feed and must parse cleanly
+            viewer_parser = etree.XMLParser(remove_blank_text=True, recover=True)
+            feed_parser = etree.XMLParser(remove_blank_text=True)
+            parser = viewer_parser
+            page_source = sb.cdp.get_page_source().encode("utf-8")
+
+            # the feed doesn't need js, so pages after the first are fetched
+            # over one keep-alive connection with the browser's cookies
+            with requests.Session() as session:
+                session.headers["User-Agent"] = sb.cdp.get_user_agent()
+                for cookie in sb.cdp.get_all_cookies():
+                    session.cookies.set(
+                        cookie.name,
+                        cookie.value,
+                        domain=cookie.domain,
+                        path=cookie.path,
+                    )
+
+                while True:
+                    print(f"fetching page {page}")
+
+                    doc = etree.fromstring(page_source, parser)
+                    root = self.xpath_rss(doc)[0]
+
+                    current_page = int(self.xpath_current_page(root)[0])
+                    total_pages = int(self.xpath_total_pages(root)[0])
+                    total_games = int(self.xpath_total_games(root)[0])
+                    print(f"{current_page}/{total_pages} ({total_games})")
+
+                    xml_bytes = etree.tostring(
+                        root, encoding="utf-8", xml_declaration=True
+                    )
+                    output_path = f"{subdir_path}/{page}.xml"
+                    with open(output_path, "wb") as f:
+                        f.write(xml_bytes)
+
+                    if current_page == total_pages:
+                        break
+                    else:
+                        page += 1
+                        next_url = f"{url}&page={page}"
+                        print(f"going to next page: {next_url}")
+                        response = session.get(next_url, timeout=self.timeout)
+                        response.raise_for_status()
+                        page_source = response.content
+                        parser = feed_parser
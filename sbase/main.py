@@ -1,4 +1,6 @@
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Sequence
 
 from gamebillet import Gamebillet
 from gamesplanet import Gamesplanet
@@ -40,34 +42,49 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
+def run_concurrently(tasks: Sequence[Callable[[], None]]):
+    # each task gets its own process so browser sessions are never shared
+    if not tasks:
+        return
+
+    with ProcessPoolExecutor(max_workers=len(tasks)) as executor:
+        futures = [executor.submit(task) for task in tasks]
+        for future in futures:
+            future.result()
+
+
 def do_indiegala(args: argparse.Namespace):
     print("indiegala")
 
     indiegala = Indiegala()
+    tasks = []
     if args.sale:
         print("--sale")
-        indiegala.on_sale()
-    elif args.all:
+        tasks.append(indiegala.on_sale)
+    if args.all:
         print("--all")
-        indiegala.all()
-    elif args.bundles:
+        tasks.append(indiegala.all)
+    if args.bundles:
         print("--bundles")
-        indiegala.bundles()
+        tasks.append(indiegala.bundles)
+    run_concurrently(tasks)
 
 
 def do_gamebillet(args: argparse.Namespace):
     print("gamebillet")
 
     gamebillet = Gamebillet()
+    tasks = []
     if args.sale:
         print("--sale")
-        gamebillet.on_sale()
+        tasks.append(gamebillet.on_sale)
     if args.all:
         print("--all")
-        gamebillet.all()
+        tasks.append(gamebillet.all)
     if args.sitemap:
         print("--sitemap")
-        gamebillet.sitemap()
+        tasks.append(gamebillet.sitemap)
+    run_concurrently(tasks)
 
 
 def do_gamesplanet(args: argparse.Namespace):
@@ -1,6 +1,17 @@
-import json
+import glob
+import os
+import pickle
 import re
 from functools import partial
+from typing import Iterable
+
+import orjson
+
+_WS = re.compile(r"\s+")
+_NON_WORD = re.compile(r"[^\w\s]")
+
+# bump when normalize() changes so cached steam name sets are rebuilt
+_STEAM_CACHE_VERSION = 1
 
 
 # skip GOG because of separate DRM
@@ -14,12 +25,12 @@ def main():
             "output/fanatical/on_sale.json",
             load_algolia,
         ),
-        # name
-        ("output/gamebillet/on_sale.json", load_single_field_name),
-        # each line is [{}], name
+        # each line is {}, name
+        ("output/gamebillet/on_sale.json", load_lines),
+        # each line is {}, name
         (
             "output/gamesplanet/on_sale.json",
-            load_gamesplanet,
+            load_lines,
         ),
         # {"results": [{"hits": [{"name"}]}]}
         (
@@ -33,18 +44,14 @@ def main():
         ("output/wingamestore/on_sale.json", load_single_field_title),
     ]
 
-    with open("temp/steam_names.txt") as f:
-        steam = f.read()
-    steam = json.loads(steam)
-    steam = [normalize(x) for x in steam]
-    steam_set = set(steam)
+    steam_set = load_steam_names("temp/steam_names.txt")
     print(f"{len(steam_set)}")
 
     for file, loader in files:
         print(file)
         names = loader(file)
 
-        names_set = set(names)
+        names_set = normalize_all(names)
         print(f"{len(names_set)}")
         diff = names_set - steam_set
         print(len(diff))
@@ -54,44 +61,72 @@ def main():
                 print(name)
 
 
+# the normalized set is cached next to the input, keyed by its mtime and size
+def load_steam_names(path: str) -> frozenset[str]:
+    stat = os.stat(path)
+    key = f"v{_STEAM_CACHE_VERSION}_{stat.st_mtime_ns}_{stat.st_size}"
+    cache_dir = os.path.dirname(path)
+    cache = os.path.join(cache_dir, f".steam_names.{key}.pkl")
+
+    if os.path.exists(cache):
+        with open(cache, "rb") as f:
+            return pickle.load(f)
+
+    with open(path, "rb") as f:
+        steam_set = frozenset(normalize_all(orjson.loads(f.read())))
+
+    tmp = f"{cache}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(steam_set, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, cache)
+
+    for old in glob.glob(os.path.join(glob.escape(cache_dir), ".steam_names.*.pkl")):
+        if old != cache:
+            os.remove(old)
+    return steam_set
+
+
 def load_algolia(path: str):
-    with open(path, "r") as f:
-        lines = f.readlines()
     output = []
-    for line in lines:
-        temp = json.loads(line)
-        for arr in temp["results"]:
-            if arr["hits"]:
-                for subarr in arr["hits"]:
-                    output.append(normalize(subarr["name"]))
+    with open(path, "rb") as f:
+        for line in f:
+            temp = orjson.loads(line)
+            for arr in temp["results"]:
+                if arr["hits"]:
+                    for subarr in arr["hits"]:
+                        output.append(subarr["name"])
     return output
 
 
-def load_gamesplanet(path: str):
-    with open(path, "r") as f:
-        lines = f.readlines()
-
+def load_lines(path: str):
     output = []
-    for line in lines:
-        line = json.loads(line)
-        for obj in line:
-            output.append(normalize(obj["name"]))
+    with open(path, "rb") as f:
+        for line in f:
+            # older files have one array per line
+            obj = orjson.loads(line)
+            rows = obj if isinstance(obj, list) else [obj]
+            output.extend(row["name"] for row in rows)
     return output
 
 
 def load_single_field(path: str, name: str):
-    with open(path, "r") as f:
+    with open(path, "rb") as f:
         items = f.read()
-    items = json.loads(items)
-    return [normalize(x[name]) for x in items]
+    items = orjson.loads(items)
+    return [x[name] for x in items]
+
+
+# loaders return raw names so duplicates are dropped before normalizing
+def normalize_all(names: Iterable[str]) -> set[str]:
+    return set(map(normalize, set(names)))
 
 
 def normalize1(s: str) -> str:
-    return re.sub(r"\s+", " ", re.sub(r"[^\w\s]", "", s)).strip().lower()
+    return _WS.sub(" ", _NON_WORD.sub("", s)).strip().lower()
 
 
 def normalize(s: str) -> str:
-    return re.sub(r"\s+", " ", s).strip().lower()
+    return _WS.sub(" ", s).strip().lower()
 
 
 if __name__ == "__main__":
@@ -1,25 +1,19 @@
-import json
 import re
 from collections import defaultdict
+from dataclasses import dataclass, fields
 from typing import Mapping, Optional, Sequence
 
+import orjson
 
+
+@dataclass(slots=True, eq=False)
 class Item:
-    def __init__(
-        self,
-        name: str,
-        appid: int,
-        developers: str,
-        publishers: str,
-        release_date: int,
-        purchase_options: Sequence[Mapping],
-    ) -> None:
-        self.name = name
-        self.appid = appid
-        self.developers = developers
-        self.publishers = publishers
-        self.release_date = release_date
-        self.purchase_options = purchase_options
+    name: str
+    appid: int
+    developers: str
+    publishers: str
+    release_date: int
+    purchase_options: Sequence[Mapping]
 
     def __hash__(self) -> int:
         return hash(
@@ -33,20 +27,20 @@ class Item:
         )
 
     def __repr__(self) -> str:
-        fields = [f"{k}: {v}" for k, v in self.__dict__.items()]
-        return "\n".join(fields)
+        lines = [f"{f.name}: {getattr(self, f.name)}" for f in fields(self)]
+        return "\n".join(lines)
 
     def __format__(self, format_spec: str) -> str:
-        fields = [f"{k}: {v}" for k, v in self.__dict__.items()]
-        return "\n".join(fields)
+        lines = [f"{f.name}: {getattr(self, f.name)}" for f in fields(self)]
+        return "\n".join(lines)
 
 
 # jaq -rs '[.[].store_items[] | {name: .name?, appid: .appid?, developers: .basic_info?.developers[]?.name?, publishers: .basic_info?.publishers[]?.name?, release_date: .release?.steam_release_date?, purchase_options: (.purchase_options | map({purchase_option_name: .purchase_option_name, packageid: .packageid, bundleid: .bundleid}))}]' < output/steam/appinfo.jsonl > temp/steam_appinfo.json
 
 
 def main():
-    with open("output/steam/appinfo.jsonl", "r") as f:
-        steam = json.load(f)
+    with open("output/steam/appinfo.jsonl", "rb") as f:
+        steam = orjson.loads(f.read())
 
     for item in steam:
         item["name"] = re.sub(r"\s+", " ", item["name"]).strip()
@@ -76,8 +70,8 @@ def main():
 
     reused = [k for k in counts.keys() if len(counts[k]) > 1]
 
-    with open("output/fanatical/on_sale.json") as f:
-        fanatical = json.load(f)
+    with open("output/fanatical/on_sale.json", "rb") as f:
+        fanatical = orjson.loads(f.read())
 
 
 if __name__ == "__main__":
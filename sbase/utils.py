@@ -0,0 +1,25 @@
+import time
+from typing import Any, Callable
+
+import orjson
+
+# deletes currency, percent, thousands separator and sign characters from
+# scraped prices and discounts
+NUM_TBL = str.maketrans("", "", "$%,-")
+
+
+# polls a js expression in the active page until predicate accepts its decoded
+# value, useful after a click when the old page is still loaded for a moment.
+# js must return a JSON.stringify result, cdp evaluate turns falsy values into None
+def wait_until(sb, js: str, predicate: Callable[[Any], bool], timeout: float = 10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        # evaluate raises while the page is being replaced
+        try:
+            value = orjson.loads(sb.cdp.evaluate(js))
+        except Exception:
+            value = None
+        if predicate(value):
+            return value
+        sb.cdp.sleep(0.1)
+    raise TimeoutError(f"timed out after {timeout}s waiting on: {js.strip()}")
@@ -242,7 +242,7 @@ impl<'a> NameInserter<'a> {
                 let mut insert_stmt = tx.prepare(Self::INSERT)?;
 
                 for line in gamebillet.lines() {
-                    let rows: Vec<GamebilletPriceInfo> = serde_json::from_str(&line)?;
+                    let rows = serde_json::from_str::<Line<GamebilletPriceInfo>>(&line)?.into_vec();
                     for row in rows {
                         let cname = normalize(&row.name);
                         if self.seen_names.insert(cname.clone()) {
@@ -272,7 +272,8 @@ impl<'a> NameInserter<'a> {
                 let mut insert_stmt = tx.prepare(Self::INSERT)?;
 
                 for line in gamesplanet.lines() {
-                    let rows: Vec<GamesplanetPriceInfo> = serde_json::from_str(&line)?;
+                    let rows =
+                        serde_json::from_str::<Line<GamesplanetPriceInfo>>(&line)?.into_vec();
                     for row in rows {
                         let cname = normalize(&row.name);
                         if self.seen_names.insert(cname.clone()) {
@@ -726,7 +727,7 @@ fn gamebillet_process(raw: Vec<u8>) -> Result<PriceData, Error> {
     let mut data: PriceData = HashMap::new();
 
     for line in raw.lines() {
-        let rows: Vec<GamebilletPriceInfo> = serde_json::from_str(&line?)?;
+        let rows = serde_json::from_str::<Line<GamebilletPriceInfo>>(&line?)?.into_vec();
 
         for row in rows.iter() {
             let cname = normalize(&row.name);
@@ -774,7 +775,7 @@ fn gamebillet_insert(mut ins: Inserter, data: PriceData, modified: u32) -> Resul
 fn gamesplanet_process(raw: Vec<u8>) -> Result<PriceData, Error> {
     let mut data: PriceData = HashMap::new();
     for line in raw.lines() {
-        let items: Vec<GamesplanetPriceInfo> = serde_json::from_str(&line?)?;
+        let items = serde_json::from_str::<Line<GamesplanetPriceInfo>>(&line?)?.into_vec();
         for row in items {
             let cname = normalize(&row.name);
             if let Some(info) = data.get_mut(&cname) {
@@ -1186,6 +1187,24 @@ fn wgs_insert(mut ins: Inserter, data: PriceData, modified: u32) -> Result<(), E
     Ok(())
 }
 
+// gamebillet/gamesplanet files written before 2026-10-14 have one array per
+// line, newer files have one item per line
+#[derive(Deserialize)]
+#[serde(untagged)]
+enum Line<T> {
+    One(T),
+    Many(Vec<T>),
+}
+
+impl<T> Line<T> {
+    fn into_vec(self) -> Vec<T> {
+        match self {
+            Line::One(row) => vec![row],
+            Line::Many(rows) => rows,
+        }
+    }
+}
+
 #[derive(Deserialize)]
 struct GamebilletPriceInfo {
     name: String,
@@ -1439,3 +1458,59 @@ struct Metadata {
     linux: bool,
     steam_deck_compat: Option<i32>,
 }
+
+#[cfg(test)]
+mod test {
+    use super::*;
+
+    #[test]
+    fn gamebillet_line() {
+        let one = r#"{"name": "Foo", "percent_discount": 50, "price": 9.99}"#;
+        let rows = serde_json::from_str::<Line<GamebilletPriceInfo>>(one)
+            .expect("object line")
+            .into_vec();
+        assert_eq!(rows.len(), 1);
+        assert_eq!(rows[0].name, "Foo");
+        assert_eq!(rows[0].percent_discount, 50);
+        assert_eq!(rows[0].price, 9.99);
+
+        let many = r#"[{"name": "Foo", "percent_discount": 50, "price": 9.99},
+            {"name": "Bar", "percent_discount": 0, "price": 0.0}]"#;
+        let rows = serde_json::from_str::<Line<GamebilletPriceInfo>>(many)
+            .expect("array line")
+            .into_vec();
+        assert_eq!(rows.len(), 2);
+        assert_eq!(rows[1].name, "Bar");
+
+        let empty = serde_json::from_str::<Line<GamebilletPriceInfo>>("[]")
+            .expect("empty line")
+            .into_vec();
+        assert!(empty.is_empty());
+    }
+
+    #[test]
+    fn gamesplanet_line() {
+        let one = r#"{"name": "Foo", "original_price": 20.0, "discount": 25, "price": 15.0}"#;
+        let rows = serde_json::from_str::<Line<GamesplanetPriceInfo>>(one)
+            .expect("object line")
+            .into_vec();
+        assert_eq!(rows.len(), 1);
+        assert_eq!(rows[0].name, "Foo");
+        assert_eq!(rows[0].original_price, 20.0);
+        assert_eq!(rows[0].discount, 25);
+        assert_eq!(rows[0].price, 15.0);
+
+        let many = r#"[{"name": "Foo", "original_price": 20.0, "discount": 25, "price": 15.0},
+            {"name": "Bar", "original_price": 5.0, "discount": 0, "price": 5.0}]"#;
+        let rows = serde_json::from_str::<Line<GamesplanetPriceInfo>>(many)
+            .expect("array line")
+            .into_vec();
+        assert_eq!(rows.len(), 2);
+        assert_eq!(rows[1].name, "Bar");
+
+        let empty = serde_json::from_str::<Line<GamesplanetPriceInfo>>("[]")
+            .expect("empty line")
+            .into_vec();
+        assert!(empty.is_empty());
+    }
+}